@@ -0,0 +1,13 @@
+""" Command round-trip benchmarks for mqtt-bed
+
+Measures the full path a command takes through mqtt-bed: MQTT message
+arrival, bed_command, the controller's send_command, payload encoding and
+publishing of any returned state. Every controller is run against fake
+pygatt/bluepy/asyncio_mqtt transports so no bed or broker is needed.
+
+Run from the repository root:
+
+    python -m benchmarks --output bench.json
+    python -m benchmarks --compare bench.json
+
+"""
@@ -0,0 +1,184 @@
+import argparse
+import json
+import logging
+import platform
+import sys
+
+from .roundtrip import CONTROLLERS, SCENARIOS, load_mqtt_bed, run_repeated
+
+# Metrics compared against a baseline with --compare; lower is better for all of them
+COMPARED_METRICS = ("mean_ms", "p95_ms")
+
+# Smallest slowdown reported as a regression, below this it is scheduler noise
+MIN_DELTA_MS = 0.05
+
+
+def compare(results, baseline, threshold, min_delta):
+    previous = {(r["controller"], r["scenario"]): r for r in baseline["results"]}
+
+    regressions = []
+    for result in results:
+        old = previous.get((result["controller"], result["scenario"]))
+        if old is None or "skipped" in result or "skipped" in old:
+            continue
+        for metric in COMPARED_METRICS:
+            # Both a relative and an absolute slowdown are needed, as a
+            # large relative change in a few microseconds is just noise
+            slower = result[metric] - old[metric]
+            if slower > old[metric] * threshold and slower > min_delta:
+                regressions.append(
+                    {
+                        "controller": result["controller"],
+                        "scenario": result["scenario"],
+                        "metric": metric,
+                        "baseline": old[metric],
+                        "current": result[metric],
+                    }
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark mqtt-bed command round trips against fake transports"
+    )
+    parser.add_argument(
+        "--controller",
+        dest="controllers",
+        action="append",
+        choices=CONTROLLERS,
+        help="Controller to benchmark, may be repeated (default: all)",
+    )
+    parser.add_argument(
+        "--scenario",
+        dest="scenarios",
+        action="append",
+        choices=SCENARIOS,
+        help="Scenario to run, may be repeated (default: all)",
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=200, help="Messages per scenario"
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=5,
+        help="Times to run each scenario, timings are the median of the runs",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="Message arrival rate for the sustained scenario, per second "
+        "(default: the measured warm throughput times --load)",
+    )
+    parser.add_argument(
+        "--load",
+        type=float,
+        default=1.5,
+        help="Arrival rate for the sustained scenario as a multiple of the "
+        "handler's warm throughput, above 1 so a queue builds",
+    )
+    parser.add_argument(
+        "--drop-every",
+        type=int,
+        default=5,
+        help="Drop the BLE link every N writes in the storm scenario",
+    )
+    parser.add_argument(
+        "--connect-delay",
+        type=float,
+        default=0.0,
+        help="Simulated BLE connect time in seconds",
+    )
+    parser.add_argument(
+        "--write-delay",
+        type=float,
+        default=0.0,
+        help="Simulated BLE write time in seconds",
+    )
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument(
+        "--compare", help="Baseline JSON results to check for regressions"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown against the baseline before failing (0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=MIN_DELTA_MS,
+        help="Ignore slowdowns smaller than this many milliseconds",
+    )
+    parser.add_argument(
+        "--log",
+        dest="log_level",
+        default="CRITICAL",
+        help="Set the log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)",
+    )
+
+    args = parser.parse_args()
+
+    numeric_level = getattr(logging, args.log_level.upper(), None)
+    if not isinstance(numeric_level, int):
+        raise ValueError(f"Invalid log level: {args.log_level}")
+    logging.basicConfig(level=numeric_level)
+
+    settings = {
+        "iterations": args.iterations,
+        "repeats": args.repeats,
+        "rate": args.rate,
+        "load": args.load,
+        "drop_every": args.drop_every,
+        "connect_delay": args.connect_delay,
+        "write_delay": args.write_delay,
+    }
+
+    # Latencies are only comparable if the baseline ran with the same settings
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r") as file:
+            baseline = json.load(file)
+        if baseline["settings"] != settings:
+            parser.error(
+                f"baseline settings {baseline['settings']} do not match {settings}"
+            )
+
+    mqtt_bed = load_mqtt_bed()
+    results = []
+    for name in args.controllers or CONTROLLERS:
+        for scenario in args.scenarios or SCENARIOS:
+            results.append(run_repeated(mqtt_bed, name, scenario, args))
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": settings,
+        "results": results,
+    }
+
+    exit_code = 0
+    if any(result["problems"] for result in results):
+        exit_code = 1
+
+    if baseline is not None:
+        report["regressions"] = compare(
+            results, baseline, args.threshold, args.min_delta_ms
+        )
+        if report["regressions"]:
+            exit_code = 1
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+""" Round-trip scenarios for the mqtt-bed benchmarks
+
+Each scenario feeds fake MQTT messages into mqtt-bed.py's bed_command and
+times how long every message takes to clear the controller and publishing of
+its state and result, measured from the moment the message arrived.
+
+cold      - a fresh controller for every message, so BLE connect is included
+warm      - one connected controller handling back-to-back messages
+sustained - messages arrive faster than the handler clears them, so the
+            queue grows and queueing delay is included
+storm     - the BLE link drops every few writes, forcing reconnects. Skipped
+            for controllers that open a new connection for every command,
+            as there is no held connection to drop.
+
+"""
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import statistics
+import time
+from unittest import mock
+
+from . import transports
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Controller name (as used for BED_TYPE) -> (module, class, command to send)
+CONTROLLERS = {
+    "serta": ("controllers.serta", "sertaBLEController", "Flat Preset"),
+    "jiecang": ("controllers.jiecang", "jiecangBLEController", "Flat"),
+    "dewertokin": ("controllers.dewertokin", "dewertokinBLEController", "Flat Preset"),
+    "dewertokin_old": (
+        "controllers.dewertokin_old",
+        "dewertokinOldBLEController",
+        "Flat Preset",
+    ),
+    "linak": ("controllers.linak", "linakBLEController", "head_up"),
+}
+
+SCENARIOS = ("cold", "warm", "sustained", "storm")
+
+# Controllers that connect, write and disconnect for every command
+PER_COMMAND_CONNECTION = {"serta", "jiecang"}
+
+BED_ADDRESS = "00:00:00:00:00:00"
+
+
+def load_mqtt_bed():
+    """Import mqtt-bed.py against the fake transports."""
+    transports.install()
+    spec = importlib.util.spec_from_file_location(
+        "mqtt_bed", os.path.join(REPO_ROOT, "mqtt-bed.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    # mqtt-bed.py reads config.yaml from the working directory on import
+    cwd = os.getcwd()
+    os.chdir(REPO_ROOT)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        os.chdir(cwd)
+    # The logger is normally created in the __main__ block
+    module.logger = logging.getLogger("mqtt_bed")
+    return module
+
+
+def create_controller(name):
+    module_name, class_name, _ = CONTROLLERS[name]
+    module = importlib.import_module(module_name)
+    cls = getattr(module, class_name)
+    if not hasattr(cls, "bluetoothPoller"):
+        return cls(BED_ADDRESS)
+    # dewertokin starts a keepalive thread that would keep writing to the
+    # shared link long after the scenario ends, so it is never run here
+    with mock.patch.object(cls, "bluetoothPoller", lambda self: None):
+        return cls(BED_ADDRESS)
+
+
+class MessageFeed:
+    """Async iterator of MQTT messages that records per-message latency.
+
+    bed_command only asks for the next message once it has finished with the
+    previous one, so the time between a message's arrival and the following
+    __anext__ call is the full round trip for that message.
+    """
+
+    def __init__(self, topic, command, count, rate=0):
+        self.topic = topic
+        self.payload = command.encode()
+        self.count = count
+        self.interval = 1 / rate if rate else 0
+        self.latencies = []
+        self._arrival = None
+        self._sent = 0
+        self._start = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        now = time.perf_counter()
+        if self._arrival is not None:
+            self.latencies.append(now - self._arrival)
+        if self._sent >= self.count:
+            raise StopAsyncIteration
+        if self._start is None:
+            self._start = now
+        if self.interval:
+            # Messages are due on a fixed schedule; if we're behind, the
+            # message has been waiting since its due time.
+            due = self._start + self._sent * self.interval
+            if due > now:
+                await asyncio.sleep(due - now)
+                self._arrival = time.perf_counter()
+            else:
+                self._arrival = due
+        else:
+            self._arrival = time.perf_counter()
+        self._sent += 1
+        return transports.FakeMessage(self.topic, self.payload)
+
+
+async def run_feed(mqtt_bed, ble, feed):
+    client = transports.Client(mqtt_bed.MQTT_SERVER)
+    await mqtt_bed.bed_command(ble, feed, client)
+    return client
+
+
+def command_results(mqtt_bed, client):
+    topic = f"{mqtt_bed.MQTT_BASE_TOPIC}/{mqtt_bed.MQTT_RESULT_TOPIC}"
+    return [json.loads(payload) for t, payload in client.published if t == topic]
+
+
+async def run_cold(mqtt_bed, name, command, iterations, rate):
+    latencies = []
+    results = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        feed = MessageFeed(mqtt_bed.MQTT_BASE_TOPIC, command, 1)
+        sent = time.perf_counter()
+        ble = create_controller(name)
+        client = await run_feed(mqtt_bed, ble, feed)
+        latencies.append(time.perf_counter() - sent)
+        results.extend(command_results(mqtt_bed, client))
+    return latencies, results, time.perf_counter() - start
+
+
+async def run_stream(mqtt_bed, name, command, iterations, rate):
+    ble = create_controller(name)
+    # Warm up the connection before anything is measured
+    await run_feed(mqtt_bed, ble, MessageFeed(mqtt_bed.MQTT_BASE_TOPIC, command, 1))
+    transports.link.clear()
+    feed = MessageFeed(mqtt_bed.MQTT_BASE_TOPIC, command, iterations, rate)
+    start = time.perf_counter()
+    client = await run_feed(mqtt_bed, ble, feed)
+    elapsed = time.perf_counter() - start
+    return feed.latencies, command_results(mqtt_bed, client), elapsed
+
+
+def summarise(latencies):
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    return {
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+        "p50_ms": round(percentile(50) * 1000, 4),
+        "p95_ms": round(percentile(95) * 1000, 4),
+        "p99_ms": round(percentile(99) * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
+
+
+def check(result):
+    """Return problems that mean the run did not measure what it claims to."""
+    problems = []
+    if result["failed"]:
+        problems.append(f"{result['failed']} commands reported failure")
+    if result["delivered"] < result["iterations"]:
+        problems.append(
+            f"only {result['delivered']} of {result['iterations']} commands reached the bed"
+        )
+    if result["scenario"] == "storm":
+        if not result["drops"]:
+            problems.append("the link was never dropped")
+        elif result["connects"] < result["drops"]:
+            problems.append("the controller did not reconnect after every drop")
+    return problems
+
+
+def sustained_rate(mqtt_bed, name, command, options):
+    """Arrival rate that overloads the handler by options.load."""
+    transports.link.reset(
+        connect_delay=options.connect_delay, write_delay=options.write_delay
+    )
+    latencies, _, elapsed = asyncio.run(
+        run_stream(mqtt_bed, name, command, options.iterations, 0)
+    )
+    return len(latencies) / elapsed * options.load
+
+
+def run_scenario(mqtt_bed, name, scenario, options):
+    _, _, command = CONTROLLERS[name]
+    if scenario == "storm" and name in PER_COMMAND_CONNECTION:
+        return {
+            "controller": name,
+            "scenario": scenario,
+            "command": command,
+            "skipped": "connects for every command, so has no held link to drop",
+            "problems": [],
+        }
+
+    link_options = {
+        "connect_delay": options.connect_delay,
+        "write_delay": options.write_delay,
+    }
+    rate = 0
+    match scenario:
+        case "cold":
+            runner = run_cold
+        case "warm":
+            runner = run_stream
+        case "sustained":
+            runner = run_stream
+            rate = options.rate or sustained_rate(mqtt_bed, name, command, options)
+        case "storm":
+            runner = run_stream
+            link_options["drop_every"] = options.drop_every
+
+    transports.link.reset(**link_options)
+    latencies, results, elapsed = asyncio.run(
+        runner(mqtt_bed, name, command, options.iterations, rate)
+    )
+
+    result = {
+        "controller": name,
+        "scenario": scenario,
+        "command": command,
+        "iterations": len(latencies),
+        "throughput_per_s": round(len(latencies) / elapsed, 2),
+        "rate_per_s": round(rate, 2) if rate else None,
+        "failed": sum(1 for r in results if not r["success"]),
+        "reconnected": sum(1 for r in results if r["reconnected"]),
+    }
+    result.update(summarise(latencies))
+    result.update(transports.link.stats())
+    result["problems"] = check(result)
+    return result
+
+
+# Per-run figures that are replaced by their median across repeats
+TIMED_METRICS = (
+    "throughput_per_s",
+    "mean_ms",
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "max_ms",
+)
+
+
+def run_repeated(mqtt_bed, name, scenario, options):
+    """Run a scenario options.repeats times and report median timings."""
+    runs = [
+        run_scenario(mqtt_bed, name, scenario, options) for _ in range(options.repeats)
+    ]
+    result = dict(runs[-1])
+    if "skipped" in result:
+        return result
+    for metric in TIMED_METRICS:
+        result[metric] = statistics.median(run[metric] for run in runs)
+    result["repeats"] = len(runs)
+    result["problems"] = list(
+        dict.fromkeys(problem for run in runs for problem in run["problems"])
+    )
+    return result
@@ -0,0 +1,167 @@
+""" Fake BLE and MQTT transports for the benchmarks
+
+install() registers stand-in pygatt, bluepy.btle and asyncio_mqtt modules in
+sys.modules so the controllers and mqtt-bed.py can be imported and driven
+without any hardware. All of the fakes share a single FakeLink, which counts
+connects and writes and can be told to add latency or drop the connection.
+
+"""
+import sys
+import time
+import types
+
+
+class FakeLink:
+    def __init__(self):
+        self.reset()
+
+    def reset(self, connect_delay=0.0, write_delay=0.0, drop_every=0):
+        self.connect_delay = connect_delay  # Seconds spent in each connect
+        self.write_delay = write_delay  # Seconds spent in each write
+        self.drop_every = drop_every  # Drop the link every N writes (0 = never)
+        self.connected = False
+        self.clear()
+
+    def clear(self):
+        """Zero the counters, leaving any open connection in place."""
+        self.connects = 0
+        self.writes = 0
+        self.delivered = 0  # Writes that reached the bed
+        self.drops = 0
+
+    def connect(self):
+        if self.connect_delay:
+            time.sleep(self.connect_delay)
+        self.connects += 1
+        self.connected = True
+
+    def drop_due(self):
+        return bool(self.drop_every) and (self.writes + 1) % self.drop_every == 0
+
+    def write(self, data, droppable=True):
+        if not self.connected:
+            raise BTLEDisconnectError("Device disconnected")
+        if droppable and self.drop_due():
+            self.writes += 1
+            self.drops += 1
+            self.connected = False
+            raise BTLEDisconnectError("Device disconnected")
+        self.writes += 1
+        self.delivered += 1
+        if self.write_delay:
+            time.sleep(self.write_delay)
+
+    def stats(self):
+        return {
+            "connects": self.connects,
+            "writes": self.writes,
+            "delivered": self.delivered,
+            "drops": self.drops,
+        }
+
+
+link = FakeLink()
+
+
+# bluepy.btle --------------------------------------------------------------------
+class BTLEException(Exception):
+    pass
+
+
+class BTLEDisconnectError(BTLEException):
+    pass
+
+
+class Peripheral:
+    def __init__(self, deviceAddr=None, addrType="public", iface=None):
+        self.addr = deviceAddr
+        self.addrType = addrType
+        link.connect()
+
+    def readCharacteristic(self, handle):
+        return b"\x00"
+
+    def writeCharacteristic(self, handle, val, withResponse=False):
+        link.write(val)
+
+    def getServices(self):
+        return []
+
+
+# pygatt -------------------------------------------------------------------------
+class GATTToolBackend:
+    def start(self):
+        pass
+
+    def stop(self):
+        link.connected = False
+
+    def connect(self, address):
+        link.connect()
+        return FakeGATTDevice(address)
+
+
+class FakeGATTDevice:
+    def __init__(self, address):
+        self.address = address
+
+    def char_write(self, uuid, value, wait_for_response=True):
+        link.write(value, droppable=False)
+
+    def char_write_handle(self, handle, value, wait_for_response=True):
+        link.write(value, droppable=False)
+
+
+# asyncio_mqtt -------------------------------------------------------------------
+class MqttError(Exception):
+    pass
+
+
+class FakeMessage:
+    def __init__(self, topic, payload):
+        self.topic = topic
+        self.payload = payload
+
+
+class Client:
+    def __init__(self, hostname, port=1883, **kwargs):
+        self.hostname = hostname
+        self.port = port
+        self.published = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def publish(self, topic, payload=None, qos=0, retain=False):
+        self.published.append((topic, payload))
+
+    async def subscribe(self, topic, qos=0):
+        pass
+
+
+def install():
+    btle = types.ModuleType("bluepy.btle")
+    btle.BTLEException = BTLEException
+    btle.BTLEDisconnectError = BTLEDisconnectError
+    btle.Peripheral = Peripheral
+    bluepy = types.ModuleType("bluepy")
+    bluepy.btle = btle
+
+    pygatt = types.ModuleType("pygatt")
+    pygatt.GATTToolBackend = GATTToolBackend
+
+    asyncio_mqtt = types.ModuleType("asyncio_mqtt")
+    asyncio_mqtt.Client = Client
+    asyncio_mqtt.MqttError = MqttError
+
+    sys.modules.update(
+        {
+            "bluepy": bluepy,
+            "bluepy.btle": btle,
+            "pygatt": pygatt,
+            "asyncio_mqtt": asyncio_mqtt,
+        }
+    )
@@ -40,6 +40,8 @@ import time
 
 import bluepy.btle as ble
 
+from .result import CommandResult
+
 
 class dewertokinBLEController:
     def __init__(self, addr):
@@ -125,31 +127,43 @@ class dewertokinBLEController:
 
     # Separate out the command handling.
     def send_command(self, name):
+        result = CommandResult(name)
         cmd = self.commands.get(name, None)
         if cmd is None:
             # print, but otherwise ignore Unknown Commands.
-            self.logger.error(f"Unknown Command '{cmd}' -- ignoring.")
-            return
+            self.logger.error(f"Unknown Command '{name}' -- ignoring.")
+            result.error = "Unknown command"
+            return result
         self.charWriteInProgress = True
+        sent = time.perf_counter()
         try:
+            result.attempts += 1
             self.charWrite(cmd)
+            result.success = True
         except Exception:
             self.logger.error("Error sending command, attempting reconnect.")
+            result.reconnected = True
             start = time.time()
             self.connectBed(ble)
             end = time.time()
             if (end - start) < 5:
                 try:
-                    self.charWrite(self, cmd)
+                    result.attempts += 1
+                    self.charWrite(cmd)
+                    result.success = True
                 except Exception:
                     self.logger.error(
                         "Command failed to transmit despite second attempt, dropping command."
                     )
+                    result.error = "Command failed to transmit despite second attempt"
             else:
                 self.logger.error(
                     "Bluetooth reconnect took more than five seconds, dropping command."
                 )
+                result.error = "Bluetooth reconnect took more than five seconds"
+        result.latency = time.perf_counter() - sent
         self.charWriteInProgress = False
+        return result
 
     # Separate charWrite function.
     def charWrite(self, cmd):
@@ -1,8 +1,14 @@
+import logging
+import time
+
 import pygatt
 
+from .result import CommandResult
+
 
 class jiecangBLEController:
     def __init__(self, addr):
+        self.logger = logging.getLogger(__name__)
         self.addr = addr
         self.manufacturer = "Jiecang"
         self.model = "Glide"
@@ -15,17 +21,28 @@ class jiecangBLEController:
         self.adapter = pygatt.GATTToolBackend()
 
     def send_command(self, name):
+        result = CommandResult(name)
         cmd = self.commands.get(name, None)
         if cmd is None:
-            raise Exception("Command not found: " + str(name))
+            self.logger.warning(f"Command not found: {name}")
+            result.error = "Unknown command"
+            return result
+        sent = time.perf_counter()
         try:
+            result.attempts += 1
             self.adapter.start()
-            device = self.adapter.connect(self.addr)
-            res = device.char_write(
-                "0000ff01-0000-1000-8000-00805f9b34fb",
-                bytes.fromhex(cmd),
-                wait_for_response=False,
-            )
-        finally:
-            self.adapter.stop()
-        return res
+            try:
+                device = self.adapter.connect(self.addr)
+                device.char_write(
+                    "0000ff01-0000-1000-8000-00805f9b34fb",
+                    bytes.fromhex(cmd),
+                    wait_for_response=False,
+                )
+            finally:
+                self.adapter.stop()
+            result.success = True
+        except Exception as e:
+            self.logger.error(f"Error sending command: {e}")
+            result.error = str(e)
+        result.latency = time.perf_counter() - sent
+        return result
@@ -5,6 +5,8 @@ import time
 
 import bluepy.btle as ble
 
+from .result import CommandResult
+
 
 class linakBLEController:
     def __init__(self, addr):
@@ -27,7 +29,7 @@ class linakBLEController:
         # To keep track of "state" since the bed doesn't
         self.head_position = 0
         self.feet_position = 0
-        self.light_status = False
+        self.light_state = False
 
         # Required fields for MQTT Discovery
         self.manufacturer = "Linak"
@@ -73,47 +75,59 @@ class linakBLEController:
     # Helper function to write command hex to BLE
     def _write_char(self, cmd):
         self.logger.debug(f"Attempting to transmit command bytes: {cmd}")
-        try:
-            self.device.writeCharacteristic(
-                0x000E,
-                bytes.fromhex(cmd),
-                withResponse=False,
-            )
-        except Exception as e:
-            self.logger.error(str(e))
+        self.device.writeCharacteristic(
+            0x000E,
+            bytes.fromhex(cmd),
+            withResponse=False,
+        )
         self.logger.debug("Command sent successfully.")
         return
 
     # Public function called by mqtt-bed.py when a command need to be sent over BLE
     def send_command(self, name):
+        result = CommandResult(name)
         cmd = self.commands.get(name, None)
         if cmd is None:
             self.logger.warning("Received unknown command... ignoring.")
-            return {}
+            result.error = "Unknown command"
+            return result
 
         self.write_in_progress = True
+        sent = time.perf_counter()
         try:
+            result.attempts += 1
             self._write_char(cmd)
-            return self.update_state_based_on_command(name)
-        except Exception:
+            result.success = True
+        except Exception as e:
+            self.logger.error(str(e))
             self.logger.error("Error sending command, attempting reconnect.")
+            result.reconnected = True
             start = time.time()
             self._connect_bed(ble)
             end = time.time()
             if (end - start) < 5:
                 try:
-                    self._write_char(self, cmd)
+                    result.attempts += 1
+                    self._write_char(cmd)
+                    result.success = True
                 except Exception:
                     self.logger.error(
                         "Command failed to transmit despite second attempt, dropping command."
                     )
+                    result.error = "Command failed to transmit despite second attempt"
             else:
                 self.logger.warning(
                     "Bluetooth reconnect took more than five seconds, dropping command."
                 )
+                result.error = "Bluetooth reconnect took more than five seconds"
         finally:
+            result.latency = time.perf_counter() - sent
             self.write_in_progress = False
 
+        if result.success:
+            result.state = self.update_state_based_on_command(name)
+        return result
+
     def toggle_light(self):
         self.light_state = not self.light_state
         self.send_command("Light")
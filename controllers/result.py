@@ -0,0 +1,33 @@
+class CommandResult:
+    """Outcome of a controller's send_command, published to the result topic."""
+
+    def __init__(self, command):
+        self.command = command
+        self.success = False
+        self.attempts = 0  # Number of BLE writes tried
+        self.latency = None  # Seconds spent on BLE, including any reconnect
+        self.reconnected = False  # True if the bed had to be reconnected
+        self.error = None
+        self.state = {}  # States to be published on {MQTT_BASE_TOPIC}/{key}/state
+        # Filled in by mqtt-bed.py
+        self.correlation_id = None
+        self.elapsed = None  # Seconds from message arrival to result
+
+    def to_dict(self):
+        payload = {
+            "command": self.command,
+            "success": self.success,
+            "attempts": self.attempts,
+            "latency_ms": _to_ms(self.latency),
+            "reconnected": self.reconnected,
+            "error": self.error,
+        }
+        if self.elapsed is not None:
+            payload["elapsed_ms"] = _to_ms(self.elapsed)
+        if self.correlation_id is not None:
+            payload["id"] = self.correlation_id
+        return payload
+
+
+def _to_ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
@@ -3,6 +3,7 @@ import asyncio
 import json
 import logging
 import ssl
+import time
 from contextlib import AsyncExitStack
 
 import yaml
@@ -34,6 +35,7 @@ MQTT_BASE_TOPIC = config.get("MQTT_BASE_TOPIC", "bed")
 MQTT_AVAILABILITY_TOPIC = config.get("MQTT_AVAILABILITY_TOPIC", "availability")
 MQTT_AVAILABLE_PAYLOAD = config.get("MQTT_AVAILABLE_PAYLOAD", "online")
 MQTT_NOT_AVAILABLE_PAYLOAD = config.get("MQTT_NOT_AVAILABLE_PAYLOAD", "offline")
+MQTT_RESULT_TOPIC = config.get("MQTT_RESULT_TOPIC", "result")
 MQTT_QOS = config.get("MQTT_QOS", 0)
 RECONNECT_INTERVAL = config.get("RECONNECT_INTERVAL", 3)
 # Auto Discovery ----------------------------------------------------------------
@@ -110,20 +112,39 @@ async def check_in(client, topic, payload):
         await asyncio.sleep(300)
 
 
+def parse_command(payload):
+    # Commands are either the plain command name, or a JSON object with the
+    # command and an optional correlation id to echo back on the result topic
+    try:
+        request = json.loads(payload)
+    except ValueError:
+        return payload, None
+    if not isinstance(request, dict) or not isinstance(request.get("command"), str):
+        return payload, None
+    return request["command"], request.get("id")
+
+
 async def bed_command(ble, messages, client):
     async for message in messages:
-        command = message.payload.decode()
+        received = time.perf_counter()
+        command, correlation_id = parse_command(message.payload.decode())
         logger.debug(f"[{MQTT_BASE_TOPIC}] {command}")
 
-        # Send the command, and allow the controller to return a dictionary
-        # of states to be returned over MQTT
-        state = ble.send_command(message.payload.decode())
+        # Send the command, the controller returns a CommandResult which may
+        # carry a dictionary of states to be returned over MQTT
+        result = ble.send_command(command)
+        result.correlation_id = correlation_id
 
         # Publish each state key-value pair to MQTT
-        if state:
-            for key, value in state.items():
-                logger.debug(f"Returned state: {value} publishing to bed/{key}/state")
-                await client.publish(f"bed/{key}/state", str(value), qos=1)
+        for key, value in result.state.items():
+            state_topic = f"{MQTT_BASE_TOPIC}/{key}/state"
+            logger.debug(f"Returned state: {value} publishing to {state_topic}")
+            await client.publish(state_topic, str(value), qos=1)
+
+        result.elapsed = time.perf_counter() - received
+        payload = json.dumps(result.to_dict())
+        logger.debug(f"[{MQTT_BASE_TOPIC}/{MQTT_RESULT_TOPIC}] {payload}")
+        await client.publish(f"{MQTT_BASE_TOPIC}/{MQTT_RESULT_TOPIC}", payload, qos=1)
 
 
 async def cancel_tasks(tasks):
@@ -0,0 +1,17 @@
+import pytest
+
+from benchmarks import roundtrip, transports
+
+# Controllers import pygatt/bluepy at module level, so the fakes go in first
+transports.install()
+
+
+@pytest.fixture(scope="session")
+def mqtt_bed():
+    return roundtrip.load_mqtt_bed()
+
+
+@pytest.fixture(autouse=True)
+def link():
+    transports.link.reset()
+    return transports.link
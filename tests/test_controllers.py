@@ -0,0 +1,95 @@
+import pytest
+
+from benchmarks import roundtrip
+from controllers.result import CommandResult
+
+ALL_CONTROLLERS = list(roundtrip.CONTROLLERS)
+# Controllers that hold a connection and retry once after reconnecting
+RETRYING_CONTROLLERS = ["dewertokin", "dewertokin_old", "linak"]
+
+
+def command_for(name):
+    return roundtrip.CONTROLLERS[name][2]
+
+
+def test_result_to_dict_omits_unset_fields():
+    result = CommandResult("Flat Preset")
+    result.latency = 0.0125
+
+    assert result.to_dict() == {
+        "command": "Flat Preset",
+        "success": False,
+        "attempts": 0,
+        "latency_ms": 12.5,
+        "reconnected": False,
+        "error": None,
+    }
+
+    result.correlation_id = "abc"
+    result.elapsed = 0.02
+    payload = result.to_dict()
+    assert payload["id"] == "abc"
+    assert payload["elapsed_ms"] == 20.0
+
+
+@pytest.mark.parametrize("name", ALL_CONTROLLERS)
+def test_unknown_command(name):
+    ble = roundtrip.create_controller(name)
+    result = ble.send_command("Not A Command")
+
+    assert isinstance(result, CommandResult)
+    assert result.success is False
+    assert result.attempts == 0
+    assert result.error == "Unknown command"
+    assert result.state == {}
+
+
+@pytest.mark.parametrize("name", ALL_CONTROLLERS)
+def test_command_sent(name, link):
+    ble = roundtrip.create_controller(name)
+    result = ble.send_command(command_for(name))
+
+    assert result.success is True
+    assert result.attempts == 1
+    assert result.reconnected is False
+    assert result.error is None
+    assert result.latency is not None
+    assert link.delivered == 1
+
+
+@pytest.mark.parametrize("name", RETRYING_CONTROLLERS)
+def test_retry_after_reconnect(name, link):
+    link.reset(drop_every=2)
+    ble = roundtrip.create_controller(name)
+    ble.send_command(command_for(name))
+    # The second write drops the link, the retry goes out on a new connection
+    result = ble.send_command(command_for(name))
+
+    assert result.success is True
+    assert result.attempts == 2
+    assert result.reconnected is True
+    assert result.error is None
+    assert link.delivered == 2
+    assert link.connects == 2
+
+
+@pytest.mark.parametrize("name", RETRYING_CONTROLLERS)
+def test_retry_fails(name, link):
+    link.reset(drop_every=1)
+    ble = roundtrip.create_controller(name)
+    result = ble.send_command(command_for(name))
+
+    assert result.success is False
+    assert result.attempts == 2
+    assert result.reconnected is True
+    assert result.error == "Command failed to transmit despite second attempt"
+    assert result.state == {}
+    assert link.delivered == 0
+
+
+def test_linak_state_only_on_success(link):
+    ble = roundtrip.create_controller("linak")
+    assert ble.send_command("head_up").state == {"head_position": 1.18}
+
+    link.reset(drop_every=1)
+    assert ble.send_command("head_up").state == {}
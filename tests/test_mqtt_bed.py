@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks import roundtrip, transports
+
+
+@pytest.mark.parametrize(
+    "payload, expected",
+    [
+        ("Flat Preset", ("Flat Preset", None)),
+        ('{"command": "Flat Preset", "id": "abc"}', ("Flat Preset", "abc")),
+        ('{"command": "Flat Preset"}', ("Flat Preset", None)),
+        ('{"command": null, "id": "abc"}', ('{"command": null, "id": "abc"}', None)),
+        ('{"command": 5}', ('{"command": 5}', None)),
+        ('{"id": "abc"}', ('{"id": "abc"}', None)),
+        ("[1, 2]", ("[1, 2]", None)),
+        ("42", ("42", None)),
+    ],
+)
+def test_parse_command(mqtt_bed, payload, expected):
+    assert mqtt_bed.parse_command(payload) == expected
+
+
+def run_bed_command(mqtt_bed, ble, *payloads):
+    class Messages:
+        def __init__(self):
+            self.pending = [
+                transports.FakeMessage(mqtt_bed.MQTT_BASE_TOPIC, p.encode())
+                for p in payloads
+            ]
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            if not self.pending:
+                raise StopAsyncIteration
+            return self.pending.pop(0)
+
+    client = transports.Client(mqtt_bed.MQTT_SERVER)
+    asyncio.run(mqtt_bed.bed_command(ble, Messages(), client))
+    return client.published
+
+
+def test_bed_command_publishes_result_with_id(mqtt_bed):
+    ble = roundtrip.create_controller("serta")
+    published = run_bed_command(
+        mqtt_bed, ble, '{"command": "Flat Preset", "id": "abc"}', "Flat Preset"
+    )
+
+    result_topic = f"{mqtt_bed.MQTT_BASE_TOPIC}/{mqtt_bed.MQTT_RESULT_TOPIC}"
+    assert [topic for topic, _ in published] == [result_topic, result_topic]
+    first, second = (json.loads(payload) for _, payload in published)
+    assert first["command"] == "Flat Preset"
+    assert first["success"] is True
+    assert first["id"] == "abc"
+    assert first["elapsed_ms"] is not None
+    assert "id" not in second
+
+
+def test_bed_command_publishes_state_before_result(mqtt_bed):
+    ble = roundtrip.create_controller("linak")
+    published = run_bed_command(mqtt_bed, ble, "head_up")
+
+    assert [topic for topic, _ in published] == [
+        f"{mqtt_bed.MQTT_BASE_TOPIC}/head_position/state",
+        f"{mqtt_bed.MQTT_BASE_TOPIC}/{mqtt_bed.MQTT_RESULT_TOPIC}",
+    ]